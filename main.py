@@ -1,14 +1,26 @@
+import anyio
+import asyncio
+import hashlib
 import os 
-from fastapi import FastAPI, File, UploadFile, HTTPException 
-from fastapi.responses import StreamingResponse 
-from pydantic import BaseModel 
-from typing import Optional 
-from datetime import datetime 
-from dotenv import load_dotenv 
+import re
+import tempfile
+from fastapi import Body, FastAPI, File, UploadFile, HTTPException, Query, Request 
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse 
+from pydantic import BaseModel, ConfigDict, StringConstraints 
+from typing import Annotated, Literal, Optional 
+from datetime import datetime, timedelta, timezone 
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import motor.motor_asyncio 
-import io 
+from async_lru import alru_cache
+import orjson
 from bson import ObjectId
-from fastapi import HTTPException
+from bson.errors import InvalidId
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 
 #Helper functions
@@ -16,57 +28,130 @@ def parse_object_id(id_str: str) -> ObjectId:
     """
     Convert a string to ObjectId if valid, else raise 400.
     Used to safely handle IDs passed in URLs.
+    The string is only parsed once, invalid IDs are caught from the ObjectId constructor.
     """
-    if ObjectId.is_valid(id_str):
+    try:
         return ObjectId(id_str)
-    else:
+    except (InvalidId, TypeError):
         raise HTTPException(status_code=400, detail=f"Invalid ID: {id_str}")
 
 
-def string_ids(doc):
+def json_default(obj):
+    """
+    Called by orjson for types it cannot serialize itself.
+    Converts ObjectId to str so MongoDB documents can be returned as they are.
     """
-    Recursively converts ObjectId to str in a dict or list.
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONResponse(ORJSONResponse):
     """
-    if isinstance(doc, list): #in case of lists  find().to_list()
-        return [string_ids(d) for d in doc]
-    if isinstance(doc, dict): #MongoDB document is a dict
-        new_doc = {}
-        for k, v in doc.items(): #iterate through key-value pairs
-            if isinstance(v, ObjectId): #if value is ObjectId, convert to str
-                new_doc[k] = str(v)
-            elif isinstance(v, (dict, list)): #if value is dict or list, call recursively for nested conversion
-                new_doc[k] = string_ids(v)
-            else:
-                new_doc[k] = v
-        return new_doc
-    return doc
+    ORJSONResponse that also handles ObjectIds (anywhere in the document) through json_default.
+    Returning it directly from an endpoint skips FastAPI's jsonable_encoder, so documents
+    are only walked once, while orjson encodes them.
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=json_default)
  
-# Load environment variables from .env file 
-load_dotenv() 
-MONGO_URI = os.getenv("MONGO_URI") # MongoDB Atlas connection string
+# Settings
+class Settings(BaseSettings):
+    """Configuration read from environment variables, or the .env file next to main.py if they are not set.
+    Field names match the variable names, e.g. mongo_uri is read from MONGO_URI."""
+    model_config = SettingsConfigDict(env_file=Path(__file__).with_name(".env"), extra="ignore")
+    mongo_uri: str # MongoDB Atlas connection string
+    mongo_uri_ro: Optional[str] = None # read-only user, falls back to the read/write user
+    mongo_max_pool_size: int = 200 # connections per client per worker
+    mongo_min_pool_size: int = 20
+    media_cache_dir: Optional[str] = None # optional local disk cache for downloads, disabled if not set (never evicted, see README)
+    max_concurrent_uploads: int = 8 # uploads written to GridFS at the same time per worker
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Load the settings once, later calls return the same object.
+    They are read at import time to build the clients, so changes need a restart."""
+    return Settings()
+
+
+settings = get_settings()
+MONGO_URI = settings.mongo_uri
+MONGO_URI_RO = settings.mongo_uri_ro or MONGO_URI
+MEDIA_CACHE_DIR = settings.media_cache_dir
  
-app = FastAPI() 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Runs once when the app starts, before any request is handled,
+    and cleans up after the last request when it shuts down."""
+    await create_indexes()
+    ticker = asyncio.create_task(tick_clock())
+    yield
+    ticker.cancel()
+    _NOW["t"] = None
+
+app = FastAPI(default_response_class=MongoJSONResponse, lifespan=lifespan) 
  
+# Connection pool and wire compression settings shared by both clients
+# zstd needs backports.zstd before Python 3.14, zlib is always available as a fallback
+MONGO_OPTIONS = {
+    "maxPoolSize": settings.mongo_max_pool_size,
+    "minPoolSize": settings.mongo_min_pool_size,
+    "compressors": "zstd,zlib",
+    "retryWrites": True,
+}
+
 # Connect to MongoDB Atlas 
-# read/write user for all operations
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI) 
+# read/write user for all writes
+client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI, readPreference="primaryPreferred", **MONGO_OPTIONS) 
 db = client.test # name of database under dbHomeAssignment Cluster
 
-# read-only user for read operations if needed (read/write user used in assignment for simplicity)
-# MONGO_URI_RO = os.getenv("MONGO_URI_RO")
-# ro_client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI_RO)
-# ro_db = ro_client.test
+# read-only user for the GET list and download endpoints
+# reads go to the primary: a lagging secondary could 404 a file that was just uploaded,
+# cut a download short after its Content-Length was already sent, or fill the list cache with a stale page
+ro_client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI_RO, readPreference="primary", **MONGO_OPTIONS)
+ro_db = ro_client.test
+
+# GridFS bucket for multimedia files (multimedia.files / multimedia.chunks)
+# Files are stored in chunks so they are not limited by the 16 MB BSON document size.
+# Each distinct file content is stored once (keyed by its sha256), every upload gets its own
+# small document in multimedia_files with the event/venue, media type and a file_id pointing to the content.
+# Uploads write the chunk and files documents themselves (see write_blob), one chunk at a time,
+# the driver's upload stream would buffer up to 48 MB of chunks before sending them.
+ro_fs = motor.motor_asyncio.AsyncIOMotorGridFSBucket(ro_db, bucket_name="multimedia")
+UPLOAD_CHUNK_SIZE = 1 << 20 # uploads are written to GridFS 1 MB at a time
+# Caps how many uploads are written at once, later uploads wait for a free slot.
+# Keeps peak memory and Mongo connections bounded under bursts of uploads.
+UPLOAD_SEMAPHORE = asyncio.Semaphore(settings.max_concurrent_uploads)
+
+
+async def create_indexes():
+    """Create the indexes used by the hot query paths (no-op if they already exist).
+    Media lookups filter on the media type plus the owning event/venue.
+    The unique indexes stop duplicate attendees (same email), duplicate bookings
+    (same attendee for the same event), the same file content being stored twice
+    and the same chunk of a resumable upload being written twice at the database
+    instead of with a read before each write."""
+    await db.multimedia_files.create_index([("media_type", 1), ("event_id", 1)])
+    await db.multimedia_files.create_index([("media_type", 1), ("venue_id", 1)])
+    await db.multimedia.files.create_index("metadata.sha256", unique=True,
+                                           partialFilterExpression={"metadata.sha256": {"$exists": True}})
+    await db.bookings.create_index([("event_id", 1), ("attendee_id", 1)], unique=True)
+    await db.attendees.create_index("email", unique=True)
+    await db.multimedia.chunks.create_index([("files_id", 1), ("n", 1)], unique=True)
+    await db.upload_sessions.create_index("last_active")
 
-#To use ro_db for read operations, replace db with ro_db in relevant endpoints
-# events = await db_ro.events.find().to_list(100)
 def clean_input(data: dict):
     """Clean input to prevent NoSQL injection.
     Reject nested dictionaries.
-    Reject string values containing '$' which is special in Mongo queries."""
-    for k,v in data.items():
-        if isinstance(v, dict):
+    Reject string values containing '$' which is special in Mongo queries.
+    Exact type checks are enough here: data always comes from model_dump() or
+    metadata built in this module, which only hold plain dict/str values."""
+    for v in data.values():
+        t = type(v)
+        if t is dict:
             raise HTTPException(status_code=400, detail="Nested dictionaries are not allowed")
-        if isinstance(v, str) and ('$' in v):
+        if t is str and '$' in v:
             raise HTTPException(status_code=400, detail="Invalid characters in input")
         
 
@@ -76,53 +161,370 @@ def safe_update_fields(data: dict, allowed_fields: set) -> dict:
     filtered = {k: v for k, v in data.items() if k in allowed_fields}
     clean_input(filtered)
     return filtered
+
+
+# Upload times only need one second precision, so the current time is refreshed
+# once a second by tick_clock instead of being read on every upload.
+_NOW = {"t": None}
+
+async def tick_clock():
+    """Background task started with the app, keeps _NOW up to date."""
+    while True:
+        _NOW["t"] = datetime.now(timezone.utc)
+        await asyncio.sleep(1)
+
+
+def utc_now() -> datetime:
+    """Current UTC time, to the second.
+    Reads the clock directly if tick_clock is not running."""
+    return _NOW["t"] or datetime.now(timezone.utc)
+
+
+def hash_file(f) -> tuple:
+    """Return the sha256 hex digest and size in bytes of a file, read from the start.
+    Blocking, run in a worker thread. The file is left rewound for the next reader."""
+    f.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := f.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    f.seek(0)
+    return digest.hexdigest(), size
+
+
+async def find_blob(sha256: str) -> Optional[ObjectId]:
+    """Return the GridFS file ID already holding this content, or None."""
+    blob = await db.multimedia.files.find_one({"metadata.sha256": sha256}, projection={"_id": 1})
+    return blob["_id"] if blob else None
+
+
+async def finish_chunks(file_id: ObjectId, filename: str, sha256: str, length: int) -> ObjectId:
+    """Add the multimedia.files document for chunks already written under file_id and return the file ID.
+    If the content is already stored, including by an upload that finished in the meantime
+    (caught by the unique sha256 index), the new chunks are deleted and the existing file is used.
+    Safe to call again for the same file_id if a previous attempt failed."""
+    existing = await find_blob(sha256)
+    if not existing:
+        try:
+            await db.multimedia.files.insert_one({
+                "_id": file_id,
+                "length": length,
+                "chunkSize": UPLOAD_CHUNK_SIZE,
+                "uploadDate": utc_now(),
+                "filename": filename,
+                "metadata": {"sha256": sha256},
+            })
+            return file_id
+        except DuplicateKeyError:
+            existing = await find_blob(sha256) # finished by another request in the meantime
+    if existing != file_id:
+        await db.multimedia.chunks.delete_many({"files_id": file_id})
+    return existing
+
+
+async def write_blob(f, filename: str, sha256: str, length: int) -> ObjectId:
+    """Store a file (read from its current position) in GridFS and return its file ID.
+    The file is read UPLOAD_CHUNK_SIZE at a time in a worker thread and each chunk is inserted
+    before the next is read, so only one chunk is held in memory.
+    If anything fails part way the chunks written so far are deleted so no orphans are left."""
+    file_id = ObjectId()
+    n = 0
+    try:
+        while data := await run_in_threadpool(f.read, UPLOAD_CHUNK_SIZE):
+            await db.multimedia.chunks.insert_one({"files_id": file_id, "n": n, "data": data})
+            n += 1
+    except BaseException:
+        #shielded so the cleanup still runs when the request is cancelled
+        with anyio.CancelScope(shield=True):
+            await db.multimedia.chunks.delete_many({"files_id": file_id})
+        raise
+    return await finish_chunks(file_id, filename, sha256, length)
+
+
+async def save_media(upload: dict, filename: str, file_id: ObjectId, sha256: str, length: int) -> ObjectId:
+    """Save the multimedia_files document for an upload and return its ID, used by the download endpoints."""
+    media_doc = {**upload, "filename": filename, "file_id": file_id, "sha256": sha256, "length": length}
+    result = await db.multimedia_files.insert_one(media_doc)
+    return result.inserted_id
+
+
+async def find_media(media_id: ObjectId, media_type: str) -> Optional[dict]:
+    """Fetch the multimedia_files document for a download, None if missing or of another media type.
+    Documents without a file_id (not migrated yet, see migrate_media.py) are treated as missing, and a leftover
+    legacy content field is never loaded."""
+    return await ro_db.multimedia_files.find_one(
+        {"_id": media_id, "media_type": media_type, "file_id": {"$exists": True}},
+        projection={"content": 0},
+    )
+
+
+async def store_upload(file: UploadFile, upload: dict) -> ObjectId:
+    """Store an uploaded file and return the ID of its multimedia_files document.
+    The file is hashed first (it is already spooled to local disk), if the same content was
+    uploaded before nothing is written to GridFS and the new document points at the stored copy.
+    Otherwise the spooled temp file is written with write_blob, one UPLOAD_CHUNK_SIZE chunk at a time.
+    At most UPLOAD_SEMAPHORE uploads are written at the same time, so they hold at most
+    UPLOAD_SEMAPHORE chunks in memory per worker."""
+    clean_input({**upload, "filename": file.filename})
+    async with UPLOAD_SEMAPHORE:
+        sha256, length = await run_in_threadpool(hash_file, file.file)
+        file_id = await find_blob(sha256) or await write_blob(file.file, file.filename, sha256, length)
+    return await save_media(upload, file.filename, file_id, sha256, length)
+
+
+async def iter_gridfs(file_id: ObjectId):
+    """Yield a GridFS file one stored chunk at a time.
+    Used as the body of a StreamingResponse so the whole file is never loaded into memory."""
+    grid_out = await ro_fs.open_download_stream(file_id)
+    try:
+        while chunk := await grid_out.readchunk():
+            yield chunk
+    finally:
+        grid_out.close()
+
+
+def media_cache_path(sha256: str) -> str:
+    """Path of the cached copy of a file inside MEDIA_CACHE_DIR, named after its content hash
+    so uploads sharing the same content share one cached copy.
+    Files are spread over sub folders named after the first two characters of the hash."""
+    return os.path.join(MEDIA_CACHE_DIR, sha256[:2], sha256)
+
+
+def open_cache_file(path: str):
+    """Create the cache sub folder and a temp file next to path, returns the open file and its path.
+    Blocking, run in a worker thread."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def discard_cache_file(tmp, tmp_path: str):
+    """Close and delete an unfinished temp file. Blocking, run in a worker thread."""
+    tmp.close()
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+async def iter_gridfs_to_cache(file_id: ObjectId, path: str):
+    """Stream a GridFS file like iter_gridfs while also writing it to a temp file.
+    The temp file is only moved into the cache once the whole file has been sent,
+    so an interrupted download never leaves a partial file in the cache.
+    All file system calls run in the threadpool so they never block the event loop."""
+    tmp, tmp_path = await run_in_threadpool(open_cache_file, path)
+    completed = False
+    try:
+        async for chunk in iter_gridfs(file_id):
+            await run_in_threadpool(tmp.write, chunk)
+            yield chunk
+        await run_in_threadpool(tmp.close)
+        await run_in_threadpool(os.replace, tmp_path, path)
+        completed = True
+    finally:
+        if not completed:
+            #shielded so the temp file is still removed when the download is cancelled (client disconnected)
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(discard_cache_file, tmp, tmp_path)
+
+
+async def media_response(media_doc: dict):
+    """Build a download response for a document from the multimedia_files collection.
+    If MEDIA_CACHE_DIR is set and the file is already cached, FileResponse serves it from disk
+    (sent with sendfile by servers supporting the ASGI pathsend extension).
+    Otherwise the body is streamed from GridFS, filling the cache on the way if enabled.
+    The cache is never evicted, old files have to be removed outside the app (see README)."""
+    if MEDIA_CACHE_DIR:
+        path = media_cache_path(media_doc["sha256"])
+        if await run_in_threadpool(os.path.exists, path):
+            return FileResponse(path,
+                                media_type=media_doc["content_type"],
+                                filename=media_doc["filename"])
+        body = iter_gridfs_to_cache(media_doc["file_id"], path)
+    else:
+        body = iter_gridfs(media_doc["file_id"])
+    return StreamingResponse(body,
+                             media_type=media_doc["content_type"],
+                             headers={"Content-Disposition": f'attachment; filename="{media_doc["filename"]}"',
+                                      "Content-Length": str(media_doc["length"])})
  
 # Data Models 
+# extra="forbid" rejects unknown fields with a 422 before they reach the database.
+# SafeStr rejects '$' inside string values while the body is validated (in pydantic-core),
+# and the fields can only hold str/int, so model_dump() output can be inserted as it is
+# without another clean_input pass over the document.
+SafeStr = Annotated[str, StringConstraints(pattern=r"^[^$]*$")]
+
 class Event(BaseModel): 
-    name: str 
-    description: str 
-    date: str 
-    venue_id: str 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    name: SafeStr 
+    description: SafeStr 
+    date: SafeStr 
+    venue_id: SafeStr 
     max_attendees: int 
  
 class Attendee(BaseModel): 
-    name: str 
-    email: str 
-    phone: Optional[str] = None 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    name: SafeStr 
+    email: SafeStr 
+    phone: Optional[SafeStr] = None 
  
 class Venue(BaseModel): 
-    name: str 
-    address: str 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    name: SafeStr 
+    address: SafeStr 
     capacity: int 
  
 class Booking(BaseModel): 
-    event_id: str 
-    attendee_id: str 
-    ticket_type: str 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    event_id: SafeStr 
+    attendee_id: SafeStr 
+    ticket_type: SafeStr 
     quantity: int 
     
+class UploadStart(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
+    filename: str
+    content_type: str
+    media_type: Literal["event_poster", "promo_video", "venue_photo"]
+    owner_id: str # event_id for posters and videos, venue_id for venue photos
+
+# Which multimedia_files field the owner_id of an upload is saved under
+MEDIA_OWNER_FIELD = {"event_poster": "event_id", "promo_video": "event_id", "venue_photo": "venue_id"}
+    
 # Allowed fields for safe updates
 EVENT_ALLOWED    = {"name", "description", "date", "venue_id", "max_attendees"}
 ATTENDEE_ALLOWED = {"name", "email", "phone"}
 VENUE_ALLOWED    = {"name", "address", "capacity"}
 BOOKING_ALLOWED  = {"event_id", "attendee_id", "ticket_type", "quantity"}
+
+# Fields returned by the list endpoints (projection), event descriptions are left out of the list view
+EVENT_LIST_FIELDS    = {"name": 1, "date": 1, "venue_id": 1, "max_attendees": 1}
+ATTENDEE_LIST_FIELDS = dict.fromkeys(ATTENDEE_ALLOWED, 1)
+VENUE_LIST_FIELDS    = dict.fromkeys(VENUE_ALLOWED, 1)
+BOOKING_LIST_FIELDS  = dict.fromkeys(BOOKING_ALLOWED, 1)
+
+NDJSON = "application/x-ndjson"
+
+# Pages from the list endpoints are cached in memory for this many seconds.
+# Writes through this API clear the cache of the collection they change, but only in the
+# worker that handled the write: each worker process has its own cache, so a page can be
+# up to LIST_CACHE_TTL old even within one worker when the write went to another worker
+# (or was made outside this API).
+LIST_CACHE_TTL = 30
+
+
+async def fetch_page(collection, projection: dict, skip: int, limit: int) -> list:
+    """Fetch one page of a collection with only the projected fields.
+    Sorted by _id so pages stay stable between requests."""
+    cursor = collection.find({}, projection).sort("_id", 1).skip(skip).limit(limit)
+    return await cursor.to_list(limit)
+
+
+@alru_cache(maxsize=16, ttl=LIST_CACHE_TTL)
+async def events_page(skip: int, limit: int) -> list:
+    return await fetch_page(ro_db.events, EVENT_LIST_FIELDS, skip, limit)
+
+@alru_cache(maxsize=16, ttl=LIST_CACHE_TTL)
+async def attendees_page(skip: int, limit: int) -> list:
+    return await fetch_page(ro_db.attendees, ATTENDEE_LIST_FIELDS, skip, limit)
+
+@alru_cache(maxsize=16, ttl=LIST_CACHE_TTL)
+async def venues_page(skip: int, limit: int) -> list:
+    return await fetch_page(ro_db.venues, VENUE_LIST_FIELDS, skip, limit)
+
+@alru_cache(maxsize=16, ttl=LIST_CACHE_TTL)
+async def bookings_page(skip: int, limit: int) -> list:
+    return await fetch_page(ro_db.bookings, BOOKING_LIST_FIELDS, skip, limit)
+
+
+async def iter_ndjson(docs: list):
+    """Yield each document as one line of newline-delimited JSON."""
+    for doc in docs:
+        yield orjson.dumps(doc, default=json_default) + b"\n"
+
+
+def list_response(request: Request, docs: list):
+    """Return a page of documents from a list endpoint.
+    Clients sending Accept: application/x-ndjson get the documents streamed one per line,
+    everyone else gets a JSON array."""
+    if NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(iter_ndjson(docs), media_type=NDJSON)
+    return MongoJSONResponse(docs)
+
+
+BULK_MAX = 1000 # max documents accepted by one bulk request
+DUPLICATE_KEY = 11000 # MongoDB error code for a unique index violation
+
+
+def duplicate_indexes(error: BulkWriteError) -> list:
+    """Return the positions of the operations rejected by a unique index.
+    Any other write error is re-raised as it is not caused by the request data."""
+    write_errors = error.details["writeErrors"]
+    if any(e["code"] != DUPLICATE_KEY for e in write_errors) or error.details.get("writeConcernErrors"):
+        raise error
+    return [e["index"] for e in write_errors]
+
+
+async def bulk_insert(collection, models: list) -> dict:
+    """Insert many documents in a single round trip (insert_many, unordered).
+    Unordered means one duplicate does not stop the rest from being inserted,
+    so ids lines up with the request and is null where the document was a duplicate."""
+    docs = [m.model_dump() for m in models]
+    try:
+        await collection.insert_many(docs, ordered=False)
+        duplicates = []
+    except BulkWriteError as e:
+        duplicates = duplicate_indexes(e)
+    #insert_many sets _id on each document before sending them
+    ids = [None if i in duplicates else str(doc["_id"]) for i, doc in enumerate(docs)]
+    return {"ids": ids, "duplicates": duplicates}
+
+
+async def bulk_update(collection, updates: dict, allowed_fields: set) -> dict:
+    """Update many documents, keyed by ID, in a single round trip (bulk_write, unordered).
+    Returns how many IDs matched a document and the positions rejected as duplicates."""
+    operations = [UpdateOne({"_id": parse_object_id(doc_id)},
+                            {"$set": safe_update_fields(model.model_dump(), allowed_fields)})
+                  for doc_id, model in updates.items()]
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        return {"matched": result.matched_count, "duplicates": []}
+    except BulkWriteError as e:
+        duplicates = duplicate_indexes(e)
+        return {"matched": e.details["nMatched"], "duplicates": duplicates}
  
 # Event Endpoints 
 @app.post("/events") 
 async def create_event(event: Event): 
-    """Create a new event. Saved under the events collection and return the inserted ID."""
-    event_doc = event.dict() 
-    clean_input(event_doc)
-    result = await db.events.insert_one(event_doc) 
-    return {"message": "Event created", "id": str(result.inserted_id)} 
+    """Create a new event. Saved under the events collection and return the inserted ID.
+    The response is returned directly as MongoJSONResponse, skipping FastAPI's jsonable_encoder."""
+    result = await db.events.insert_one(event.model_dump())
+    events_page.cache_clear()
+    return MongoJSONResponse({"message": "Event created", "id": result.inserted_id}) 
  
 @app.get("/events")
-async def get_events():
-    """Retrieve up to a 100 documents from the events collection in this case all documents. 
-    Converts ObjectIds to strings before returning."""
-    events = await db.events.find().to_list(100)
-    events = string_ids(events) 
-    return events
+async def get_events(request: Request, skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    """Retrieve a page of events (default 50, at most 100), skip is used to page through.
+    Only the list fields are fetched, the description is left out.
+    Pages are cached for LIST_CACHE_TTL seconds, writes to events clear the cache.
+    ObjectIds are converted to strings by MongoJSONResponse while encoding."""
+    return list_response(request, await events_page(skip, limit))
+
+@app.post("/events/bulk")
+async def bulk_create_events(events: list[Event] = Body(min_length=1, max_length=BULK_MAX)):
+    """Create many events with one insert_many call instead of one request per event.
+    Returns the inserted IDs in the same order as the request."""
+    result = await bulk_insert(db.events, events)
+    events_page.cache_clear()
+    return MongoJSONResponse({"message": "Events created", **result})
+
+@app.put("/events/bulk")
+async def bulk_update_events(events: dict[str, Event] = Body(min_length=1, max_length=BULK_MAX)):
+    """Update many events with one bulk_write call, the body maps each event_id to its new data.
+    Returns how many of the IDs were found."""
+    result = await bulk_update(db.events, events, EVENT_ALLOWED)
+    events_page.cache_clear()
+    return {"message": "Events updated", **result}
 
 @app.put("/events/{event_id}")
 async def update_event(event_id: str, event: Event):
@@ -130,8 +532,9 @@ async def update_event(event_id: str, event: Event):
     Helper function is called to convert the string Id back to an ObjectId making it 
     usable for MongoDB. If no event with the ID is found, 404."""
     obj_id = parse_object_id(event_id)  
-    safe_data = safe_update_fields(event.dict(), EVENT_ALLOWED)
+    safe_data = safe_update_fields(event.model_dump(), EVENT_ALLOWED)
     result = await db.events.update_one({"_id": obj_id}, {"$set": safe_data})
+    events_page.cache_clear()
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
     return {"message": "Event updated"}
@@ -143,6 +546,7 @@ async def delete_event(event_id: str):
     If event with that id doesnt exist 404."""
     obj_id = parse_object_id(event_id) 
     result = await db.events.delete_one({"_id": obj_id})
+    events_page.cache_clear()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
     return {"message": "Event deleted"}
@@ -151,36 +555,31 @@ async def delete_event(event_id: str):
 @app.post("/upload_event_poster/{event_id}") 
 async def upload_event_poster(event_id: str, file: UploadFile = File(...)): 
     """Upload an event poster image file linked to an event id.
-    The file is saved as binary data in the multimedia_files collection.
+    The file is streamed into the multimedia GridFS bucket (unless the same file was uploaded before),
+    details are saved in the multimedia_files collection.
     Media type is specified as event_poster for easy retrieval."""
-    content = await file.read() 
-    poster_doc = { 
-        "event_id": event_id, 
-        "filename": file.filename, 
-        "content_type": file.content_type, 
-        "content": content, 
+    poster_meta = {
+        "event_id": event_id,
+        "content_type": file.content_type,
         "media_type": "event_poster",
-        "uploaded_at": datetime.utcnow() 
-    } 
-    clean_input(poster_doc)
-    result = await db.multimedia_files.insert_one(poster_doc) 
-    return {"message": "Event poster uploaded", "id": str(result.inserted_id)}
+        "uploaded_at": utc_now()
+    }
+    poster_id = await store_upload(file, poster_meta)
+    return {"message": "Event poster uploaded", "id": str(poster_id)}
 
 # Download Event Poster (Image)
 @app.get("/download_event_poster/{poster_id}")
 async def download_event_poster(poster_id: str):
     """Download an event poster image file by its ID.
     Validation to make sure file exists and is of media_type event_poster.
-    StreamingResponse is used to send the binary data to the browser/Postman."""
+    Only the small multimedia_files document is fetched here, the GridFS chunks are streamed to the browser/Postman."""
     obj_id = parse_object_id(poster_id)
-    poster = await db.multimedia_files.find_one({"_id": obj_id, "media_type": "event_poster"})
+    poster = await find_media(obj_id, "event_poster")
     if not poster:
         raise HTTPException(status_code=404, detail="Poster not found")
 
-    return StreamingResponse(io.BytesIO(poster["content"]),
-                             media_type=poster["content_type"],
-                             headers={"Content-Disposition": f"attachment; filename={poster['filename']}"})
-    #BytesIO converts byte data to a stream for StreamingResponse
+    return await media_response(poster)
+    #chunks are read from GridFS one at a time and sent as they arrive
     #content-type = image/png or image/jpeg based on uploaded file
     #Content-Disposition  : attachment - downloads instead of displaying in browser
                             #filename= sets the default filename for download
@@ -190,20 +589,16 @@ async def download_event_poster(poster_id: str):
 @app.post("/upload_promo_video/{event_id}")
 async def upload_promo_video(event_id: str, file: UploadFile = File(...)):
     """Upload a promotional video file linked to an event id.
-    Like event posters, the video is saved as binary data in multimedia_files collection.
+    Like event posters, the video is stored in the multimedia GridFS bucket.
     Media type is promo_video for easy retrieval."""
-    content = await file.read()
-    video_doc = {
+    video_meta = {
         "event_id": event_id,
-        "filename": file.filename,
         "content_type": file.content_type,
-        "content": content,
         "media_type": "promo_video",
-        "uploaded_at": datetime.utcnow()
+        "uploaded_at": utc_now()
     }
-    clean_input(video_doc)
-    result = await db.multimedia_files.insert_one(video_doc)
-    return {"message": "Promotional video uploaded", "id": str(result.inserted_id)}
+    video_id = await store_upload(file, video_meta)
+    return {"message": "Promotional video uploaded", "id": str(video_id)}
 
 # Download Promotional Video (Video)
 @app.get("/download_promo_video/{video_id}")
@@ -212,31 +607,25 @@ async def download_promo_video(video_id: str):
     Validation to make sure file exists and is of media_type promo_video.
     Downloading works the same as event posters."""
     obj_id = parse_object_id(video_id)
-    video = await db.multimedia_files.find_one({"_id": obj_id, "media_type": "promo_video"})
+    video = await find_media(obj_id, "promo_video")
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
-    return StreamingResponse(io.BytesIO(video["content"]),
-                             media_type=video["content_type"],
-                             headers={"Content-Disposition": f"attachment; filename={video['filename']}"})
+    return await media_response(video)
 
 # Upload Venue Photo (Image)
 @app.post("/upload_venue_photo/{venue_id}")
 async def upload_venue_photo(venue_id: str, file: UploadFile = File(...)):
     """Upload a venue photo image file linked to a venue id.
-    Binary data saved in multimedia_files collection with media_type venue_photo."""
-    content = await file.read()
-    photo_doc = {
+    Stored in the multimedia GridFS bucket, details saved in multimedia_files with media_type venue_photo."""
+    photo_meta = {
         "venue_id": venue_id,
-        "filename": file.filename,
         "content_type": file.content_type,
-        "content": content,
         "media_type": "venue_photo",
-        "uploaded_at": datetime.utcnow()
+        "uploaded_at": utc_now()
     }
-    clean_input(photo_doc)
-    result = await db.multimedia_files.insert_one(photo_doc)
-    return {"message": "Venue photo uploaded", "id": str(result.inserted_id)}
+    photo_id = await store_upload(file, photo_meta)
+    return {"message": "Venue photo uploaded", "id": str(photo_id)}
 
 # Download Venue Photo (Image)
 @app.get("/download_venue_photo/{photo_id}")
@@ -245,30 +634,274 @@ async def download_venue_photo(photo_id: str):
     Validation to ensure file exists and is of media_type venue_photo.
     Same downloading as event posters and promo video."""
     obj_id = parse_object_id(photo_id)
-    photo = await db.multimedia_files.find_one({"_id": obj_id, "media_type": "venue_photo"})
+    photo = await find_media(obj_id, "venue_photo")
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
 
-    return StreamingResponse(io.BytesIO(photo["content"]),
-                             media_type=photo["content_type"],
-                             headers={"Content-Disposition": f"attachment; filename={photo['filename']}"})
+    return await media_response(photo)
+
+# Resumable Uploads
+# Uploads in progress are stored in MongoDB so any worker (or serverless instance) can take the next chunk.
+# Each upload has a document in upload_sessions (keyed by the upload ID, which becomes the multimedia_files ID
+# once complete) holding the bytes received so far, and its data is written straight to multimedia.chunks
+# as GridFS chunks numbered n. The multimedia.files document is only added when the upload completes.
+UPLOAD_SESSION_TIMEOUT = 3600 # seconds without data before an upload is aborted
+UPLOAD_WRITER_TIMEOUT = 60 # seconds without data before a chunk request loses its claim on an upload
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+def writer_free() -> dict:
+    """Filter for sessions no request is writing to, a claim is dropped after UPLOAD_WRITER_TIMEOUT."""
+    return {"$or": [{"writer": None},
+                    {"last_active": {"$lt": utc_now() - timedelta(seconds=UPLOAD_WRITER_TIMEOUT)}}]}
+
+
+async def renew_claim(upload_oid: ObjectId, writer: ObjectId):
+    """Keep a request's claim on an upload alive, 409 if it was lost after UPLOAD_WRITER_TIMEOUT."""
+    renewed = await db.upload_sessions.update_one({"_id": upload_oid, "writer": writer},
+                                                  {"$set": {"last_active": utc_now()}})
+    if not renewed.matched_count:
+        raise HTTPException(status_code=409, detail="Upload timed out while this request was using it")
+
+
+async def get_upload_session(upload_oid: ObjectId) -> dict:
+    """Return the session of an upload in progress, else 404."""
+    session = await db.upload_sessions.find_one({"_id": upload_oid})
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+async def delete_upload_chunks(file_id: ObjectId):
+    """Delete the chunks of an unfinished upload, unless it already became a stored file."""
+    if not await db.multimedia.files.find_one({"_id": file_id}, projection={"_id": 1}):
+        await db.multimedia.chunks.delete_many({"files_id": file_id})
+
+
+async def expire_upload_sessions():
+    """Abort uploads that have not received any data for UPLOAD_SESSION_TIMEOUT seconds,
+    removing their chunks from GridFS."""
+    cutoff = utc_now() - timedelta(seconds=UPLOAD_SESSION_TIMEOUT)
+    async for session in db.upload_sessions.find({"last_active": {"$lt": cutoff}}, projection={"file_id": 1}):
+        result = await db.upload_sessions.delete_one({"_id": session["_id"], "last_active": {"$lt": cutoff}})
+        if result.deleted_count:
+            await delete_upload_chunks(session["file_id"])
+
+
+async def hash_upload_chunks(session: dict, writer: ObjectId) -> str:
+    """Read an upload's chunks back in order and return the sha256 of the content.
+    409 if a chunk is missing or the chunks do not add up to the declared total.
+    The request's claim on the upload is renewed while reading, large files can take a while."""
+    digest = hashlib.sha256()
+    size = 0
+    expected_n = 0
+    total = session["total"]
+    renewed_at = utc_now()
+    chunks = db.multimedia.chunks.find({"files_id": session["file_id"]}, projection={"n": 1, "data": 1})
+    async for chunk in chunks.sort("n", 1):
+        if utc_now() - renewed_at > timedelta(seconds=UPLOAD_WRITER_TIMEOUT // 4):
+            await renew_claim(session["_id"], writer)
+            renewed_at = utc_now()
+        if chunk["n"] != expected_n:
+            raise HTTPException(status_code=409, detail=f"Chunk {expected_n} of the upload is missing")
+        digest.update(chunk["data"])
+        size += len(chunk["data"])
+        expected_n += 1
+    if size != total:
+        raise HTTPException(status_code=409, detail=f"Stored {size} of {total} bytes")
+    return digest.hexdigest()
+
+
+@app.post("/uploads")
+async def start_upload(upload: UploadStart):
+    """Start a resumable upload for large files, returns the upload_id used by the other /uploads endpoints.
+    The file is sent in chunks with PATCH /uploads/{upload_id} and finished with
+    POST /uploads/{upload_id}/complete, so neither side has to hold the whole file in memory."""
+    await expire_upload_sessions()
+    upload_meta = {
+        "_id": ObjectId(),
+        MEDIA_OWNER_FIELD[upload.media_type]: upload.owner_id,
+        "content_type": upload.content_type,
+        "media_type": upload.media_type,
+        "uploaded_at": utc_now()
+    }
+    clean_input({**upload_meta, "filename": upload.filename})
+    await db.upload_sessions.insert_one({"_id": upload_meta["_id"], "upload": upload_meta,
+                                         "filename": upload.filename, "file_id": ObjectId(), "total": None,
+                                         "received": 0, "writer": None, "last_active": utc_now()})
+    return {"message": "Upload started", "upload_id": str(upload_meta["_id"])}
+
+@app.patch("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request):
+    """Append a chunk (the raw request body) to an upload in progress.
+    Content-Range: bytes start-end/total is required and start must equal the bytes received so far,
+    else 409 so the client can resume from the returned offset. The total is recorded by the first chunk
+    and must not change. Every chunk but the last must be a multiple of 1 MB (UPLOAD_CHUNK_SIZE),
+    chunks of 8 MB or more are recommended. The body must be exactly end - start + 1 bytes.
+    The body is written to GridFS as it arrives, at most UPLOAD_CHUNK_SIZE is buffered.
+    Each GridFS write counts towards UPLOAD_SEMAPHORE like the single request uploads,
+    the slot is not held while waiting for the client to send more of the body.
+    Only one request can write to an upload at a time, the claim is kept in its session document."""
+    upload_oid = parse_object_id(upload_id)
+    match = CONTENT_RANGE.fullmatch(request.headers.get("content-range", ""))
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range header must be 'bytes start-end/total'")
+    start, end, total = (int(g) for g in match.groups())
+    if not start <= end < total:
+        raise HTTPException(status_code=400, detail="Content-Range must have start <= end < total")
+    length = end - start + 1
+    if start % UPLOAD_CHUNK_SIZE or (end + 1 != total and length % UPLOAD_CHUNK_SIZE):
+        raise HTTPException(status_code=400, detail=f"Chunks other than the last must be a multiple of {UPLOAD_CHUNK_SIZE} bytes")
+
+    writer = ObjectId()
+    session = await db.upload_sessions.find_one_and_update(
+        {"_id": upload_oid, "received": start, "total": {"$in": [None, total]}, **writer_free()},
+        {"$set": {"total": total, "writer": writer, "last_active": utc_now()}},
+    )
+    if not session:
+        session = await get_upload_session(upload_oid)
+        if session["received"] != start:
+            raise HTTPException(status_code=409, detail=f"Expected chunk starting at byte {session['received']}")
+        if session["total"] != total:
+            raise HTTPException(status_code=409, detail=f"Upload total is {session['total']} bytes")
+        raise HTTPException(status_code=409, detail="Another request is using this upload")
+
+    file_id = session["file_id"]
+    written = [] # chunk IDs written by this request, deleted again if it fails
+    n = start // UPLOAD_CHUNK_SIZE
+
+    async def write_chunk(data: bytes):
+        nonlocal n
+        try:
+            async with UPLOAD_SEMAPHORE:
+                result = await db.multimedia.chunks.insert_one({"files_id": file_id, "n": n, "data": data})
+        except DuplicateKeyError:
+            raise HTTPException(status_code=409, detail="Another request is using this upload")
+        written.append(result.inserted_id)
+        n += 1
+        await renew_claim(upload_oid, writer)
+
+    received = 0
+    completed = False
+    try:
+        #left over by a request that lost its claim on the upload without cleaning up
+        await db.multimedia.chunks.delete_many({"files_id": file_id, "n": {"$gte": n}})
+        buffer = bytearray()
+        async for part in request.stream():
+            received += len(part)
+            if received > length:
+                raise HTTPException(status_code=400, detail=f"Body is longer than the {length} bytes in Content-Range")
+            buffer += part
+            while len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await write_chunk(bytes(buffer[:UPLOAD_CHUNK_SIZE]))
+                del buffer[:UPLOAD_CHUNK_SIZE]
+        if received != length:
+            raise HTTPException(status_code=400, detail=f"Body is shorter than the {length} bytes in Content-Range")
+        if buffer:
+            await write_chunk(bytes(buffer))
+        committed = await db.upload_sessions.update_one(
+            {"_id": upload_oid, "writer": writer},
+            {"$set": {"received": end + 1, "writer": None, "last_active": utc_now()}},
+        )
+        if not committed.matched_count:
+            raise HTTPException(status_code=409, detail="Upload timed out while this request was using it")
+        completed = True
+    finally:
+        if not completed:
+            #the client resumes from the last committed offset, so the chunks of this request are removed.
+            #shielded so the cleanup still runs when the request is cancelled (client disconnected)
+            with anyio.CancelScope(shield=True):
+                if written:
+                    await db.multimedia.chunks.delete_many({"_id": {"$in": written}})
+                await db.upload_sessions.update_one({"_id": upload_oid, "writer": writer}, {"$set": {"writer": None}})
+    return {"message": "Chunk received", "received": end + 1}
+
+@app.post("/uploads/{upload_id}/complete")
+async def complete_upload(upload_id: str):
+    """Finish an upload, the file can then be downloaded with the download endpoint for its media type
+    using the upload_id. 409 if fewer bytes than the Content-Range total were received.
+    The content is hashed from the stored chunks, if the same content was uploaded before, the chunks
+    are deleted and the upload points at the stored copy instead.
+    The session is claimed like a chunk request, so it cannot be cancelled or expire while it is completed.
+    It is only deleted once the upload is saved, so a failed request can simply be retried."""
+    upload_oid = parse_object_id(upload_id)
+    writer = ObjectId()
+    session = await db.upload_sessions.find_one_and_update(
+        {"_id": upload_oid, **writer_free()},
+        {"$set": {"writer": writer, "last_active": utc_now()}},
+    )
+    if not session:
+        await get_upload_session(upload_oid)
+        raise HTTPException(status_code=409, detail="Another request is using this upload")
+
+    completed = False
+    try:
+        if session["total"] is None or session["received"] != session["total"]:
+            raise HTTPException(status_code=409, detail=f"Received {session['received']} of {session['total']} bytes")
+        sha256 = session.get("sha256")
+        if not sha256:
+            sha256 = await hash_upload_chunks(session, writer)
+            #kept in case this request fails after duplicate chunks were deleted
+            await db.upload_sessions.update_one({"_id": upload_oid}, {"$set": {"sha256": sha256}})
+        await renew_claim(upload_oid, writer)
+        file_id = await finish_chunks(session["file_id"], session["filename"], sha256, session["total"])
+        try:
+            await save_media(session["upload"], session["filename"], file_id, sha256, session["total"])
+        except DuplicateKeyError:
+            pass # saved by an earlier attempt
+        await db.upload_sessions.delete_one({"_id": upload_oid, "writer": writer})
+        completed = True
+    finally:
+        if not completed:
+            with anyio.CancelScope(shield=True):
+                await db.upload_sessions.update_one({"_id": upload_oid, "writer": writer}, {"$set": {"writer": None}})
+    return {"message": "Upload complete", "id": upload_id, "length": session["total"]}
+
+@app.delete("/uploads/{upload_id}")
+async def abort_upload(upload_id: str):
+    """Cancel an upload in progress and delete the chunks already stored."""
+    upload_oid = parse_object_id(upload_id)
+    session = await db.upload_sessions.find_one_and_delete({"_id": upload_oid, **writer_free()})
+    if not session:
+        await get_upload_session(upload_oid)
+        raise HTTPException(status_code=409, detail="Another request is using this upload")
+    await delete_upload_chunks(session["file_id"])
+    return {"message": "Upload cancelled"}
 
 #Attendee Endpoints
 @app.post("/attendees")
 async def create_attendee(attendee: Attendee):
-    """Create a new attendee. Saved under the attendees collection and return the inserted ID."""
-    attendee_doc = attendee.dict()
-    clean_input(attendee_doc)
-    result = await db.attendees.insert_one(attendee_doc)
-    return {"message": "Attendee created", "id": str(result.inserted_id)}
+    """Create a new attendee. Saved under the attendees collection and return the inserted ID.
+    Emails are unique, if the email is already used 409."""
+    try:
+        result = await db.attendees.insert_one(attendee.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An attendee with this email already exists")
+    attendees_page.cache_clear()
+    return MongoJSONResponse({"message": "Attendee created", "id": result.inserted_id})
 
 @app.get("/attendees")
-async def get_attendees():
-    """Retrieve all attendees found within the attendees collection.
-    Converts ObjectIds to strings before returning."""
-    attendees = await db.attendees.find().to_list(100)
-    attendees = string_ids(attendees)
-    return attendees
+async def get_attendees(request: Request, skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    """Retrieve a page of attendees (default 50, at most 100), skip is used to page through.
+    Pages are cached for LIST_CACHE_TTL seconds, writes to attendees clear the cache.
+    ObjectIds are converted to strings by MongoJSONResponse while encoding."""
+    return list_response(request, await attendees_page(skip, limit))
+
+@app.post("/attendees/bulk")
+async def bulk_create_attendees(attendees: list[Attendee] = Body(min_length=1, max_length=BULK_MAX)):
+    """Create many attendees with one insert_many call instead of one request per attendee.
+    Returns the inserted IDs in the same order as the request."""
+    result = await bulk_insert(db.attendees, attendees)
+    attendees_page.cache_clear()
+    return MongoJSONResponse({"message": "Attendees created", **result})
+
+@app.put("/attendees/bulk")
+async def bulk_update_attendees(attendees: dict[str, Attendee] = Body(min_length=1, max_length=BULK_MAX)):
+    """Update many attendees with one bulk_write call, the body maps each attendee_id to its new data.
+    Returns how many of the IDs were found."""
+    result = await bulk_update(db.attendees, attendees, ATTENDEE_ALLOWED)
+    attendees_page.cache_clear()
+    return {"message": "Attendees updated", **result}
 
 @app.put("/attendees/{attendee_id}")
 async def update_attendee(attendee_id: str, attendee: Attendee):
@@ -276,8 +909,12 @@ async def update_attendee(attendee_id: str, attendee: Attendee):
         Helper function is called to convert the string Id back to an ObjectId making it
         usable for MongoDB. If no attendee with the ID is found, 404."""
     obj_id = parse_object_id(attendee_id) 
-    safe_data = safe_update_fields(attendee.dict(), ATTENDEE_ALLOWED)
-    result = await db.attendees.update_one({"_id": obj_id}, {"$set": safe_data})
+    safe_data = safe_update_fields(attendee.model_dump(), ATTENDEE_ALLOWED)
+    try:
+        result = await db.attendees.update_one({"_id": obj_id}, {"$set": safe_data})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="An attendee with this email already exists")
+    attendees_page.cache_clear()
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Attendee not found")
     return {"message": "Attendee updated"}
@@ -288,6 +925,7 @@ async def delete_attendee(attendee_id: str):
      If attendee with that id doesnt exist 404."""
     obj_id = parse_object_id(attendee_id) 
     result = await db.attendees.delete_one({"_id": obj_id})
+    attendees_page.cache_clear()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Attendee not found")
     return {"message": "Attendee deleted"}
@@ -296,18 +934,16 @@ async def delete_attendee(attendee_id: str):
 @app.post("/venues")
 async def create_venue(venue: Venue):
     """Create a new venue. Saved under the venues collection and return the inserted ID."""
-    venue_doc = venue.dict()
-    clean_input(venue_doc)
-    result = await db.venues.insert_one(venue_doc)
-    return {"message": "Venue created", "id": str(result.inserted_id)}
+    result = await db.venues.insert_one(venue.model_dump())
+    venues_page.cache_clear()
+    return MongoJSONResponse({"message": "Venue created", "id": result.inserted_id})
 
 @app.get("/venues")
-async def get_venues():
-    """Retrieve all venues from the venues collection.
-    Converts ObjectIds to strings before returning."""
-    venues = await db.venues.find().to_list(100)
-    venues = string_ids(venues)
-    return venues
+async def get_venues(request: Request, skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    """Retrieve a page of venues (default 50, at most 100), skip is used to page through.
+    Pages are cached for LIST_CACHE_TTL seconds, writes to venues clear the cache.
+    ObjectIds are converted to strings by MongoJSONResponse while encoding."""
+    return list_response(request, await venues_page(skip, limit))
 
 @app.put("/venues/{venue_id}")
 async def update_venue(venue_id: str, venue: Venue):
@@ -315,8 +951,9 @@ async def update_venue(venue_id: str, venue: Venue):
      Helper function is called to convert the string Id back to an ObjectId making it
      usable for MongoDB. If no venue with the ID is found, 404."""
     obj_id = parse_object_id(venue_id) 
-    safe_data = safe_update_fields(venue.dict(), VENUE_ALLOWED)
+    safe_data = safe_update_fields(venue.model_dump(), VENUE_ALLOWED)
     result = await db.venues.update_one({"_id": obj_id}, {"$set": safe_data})
+    venues_page.cache_clear()
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Venue not found")
     return {"message": "Venue updated"}
@@ -327,6 +964,7 @@ async def delete_venue(venue_id: str):
      If venue with that id doesnt exist 404."""
     obj_id = parse_object_id(venue_id) 
     result = await db.venues.delete_one({"_id": obj_id})
+    venues_page.cache_clear()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Venue not found")
     return {"message": "Venue deleted"}
@@ -334,19 +972,37 @@ async def delete_venue(venue_id: str):
 #Booking Endpoints
 @app.post("/bookings")
 async def create_booking(booking: Booking):
-    """Create a new booking. Saved under the bookings collection and return the inserted ID."""
-    booking_doc = booking.dict()
-    clean_input(booking_doc)
-    result = await db.bookings.insert_one(booking_doc)
-    return {"message": "Booking created", "id": str(result.inserted_id)}
+    """Create a new booking. Saved under the bookings collection and return the inserted ID.
+    An attendee can only have one booking per event, if one already exists 409."""
+    try:
+        result = await db.bookings.insert_one(booking.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="This attendee already has a booking for this event")
+    bookings_page.cache_clear()
+    return MongoJSONResponse({"message": "Booking created", "id": result.inserted_id})
 
 @app.get("/bookings")
-async def get_bookings():
-    """Retrieve all bookings from the bookings collection.
-    Converts ObjectIds to strings before returning."""
-    bookings = await db.bookings.find().to_list(100)
-    bookings = string_ids(bookings)
-    return bookings
+async def get_bookings(request: Request, skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    """Retrieve a page of bookings (default 50, at most 100), skip is used to page through.
+    Pages are cached for LIST_CACHE_TTL seconds, writes to bookings clear the cache.
+    ObjectIds are converted to strings by MongoJSONResponse while encoding."""
+    return list_response(request, await bookings_page(skip, limit))
+
+@app.post("/bookings/bulk")
+async def bulk_create_bookings(bookings: list[Booking] = Body(min_length=1, max_length=BULK_MAX)):
+    """Create many bookings with one insert_many call instead of one request per booking.
+    Returns the inserted IDs in the same order as the request."""
+    result = await bulk_insert(db.bookings, bookings)
+    bookings_page.cache_clear()
+    return MongoJSONResponse({"message": "Bookings created", **result})
+
+@app.put("/bookings/bulk")
+async def bulk_update_bookings(bookings: dict[str, Booking] = Body(min_length=1, max_length=BULK_MAX)):
+    """Update many bookings with one bulk_write call, the body maps each booking_id to its new data.
+    Returns how many of the IDs were found."""
+    result = await bulk_update(db.bookings, bookings, BOOKING_ALLOWED)
+    bookings_page.cache_clear()
+    return {"message": "Bookings updated", **result}
 
 @app.put("/bookings/{booking_id}")
 async def update_booking(booking_id: str, booking: Booking):
@@ -354,8 +1010,12 @@ async def update_booking(booking_id: str, booking: Booking):
      Helper function is called to convert the string Id back to an ObjectId making it
      usable for MongoDB. If no booking with the ID is found, 404."""
     obj_id = parse_object_id(booking_id) 
-    safe_data = safe_update_fields(booking.dict(), BOOKING_ALLOWED)
-    result = await db.bookings.update_one({"_id": obj_id}, {"$set": safe_data})
+    safe_data = safe_update_fields(booking.model_dump(), BOOKING_ALLOWED)
+    try:
+        result = await db.bookings.update_one({"_id": obj_id}, {"$set": safe_data})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="This attendee already has a booking for this event")
+    bookings_page.cache_clear()
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"message": "Booking updated"}
@@ -366,6 +1026,7 @@ async def delete_booking(booking_id: str):
      If booking with that id doesnt exist 404."""
     obj_id = parse_object_id(booking_id) 
     result = await db.bookings.delete_one({"_id": obj_id} )
+    bookings_page.cache_clear()
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"message": "Booking deleted"}
@@ -0,0 +1,34 @@
+"""One-off migration: move files saved before GridFS was used (the whole file in the content field
+of their multimedia_files document) into GridFS, so they download like new uploads.
+Run it once with: python migrate_media.py
+Documents are migrated one at a time so only one legacy file is in memory, running it again is a no-op.
+Safe to run more than once at the same time, a document is only updated if it has no file_id yet."""
+import asyncio
+import io
+from fastapi.concurrency import run_in_threadpool
+from main import db, find_blob, hash_file, write_blob
+
+
+async def migrate_legacy_media() -> int:
+    """Migrate every legacy document and return how many were migrated."""
+    migrated = 0
+    legacy = db.multimedia_files.find({"file_id": {"$exists": False}, "content": {"$exists": True}},
+                                      projection={"_id": 1})
+    async for doc in legacy:
+        doc = await db.multimedia_files.find_one({"_id": doc["_id"], "file_id": {"$exists": False}},
+                                                 projection={"content": 1, "filename": 1})
+        if not doc:
+            continue # migrated by another run in the meantime
+        content = bytes(doc["content"])
+        sha256, length = await run_in_threadpool(hash_file, io.BytesIO(content))
+        file_id = await find_blob(sha256) or await write_blob(io.BytesIO(content), doc.get("filename") or "", sha256, length)
+        result = await db.multimedia_files.update_one(
+            {"_id": doc["_id"], "file_id": {"$exists": False}},
+            {"$set": {"file_id": file_id, "sha256": sha256, "length": length}, "$unset": {"content": ""}},
+        )
+        migrated += result.modified_count
+    return migrated
+
+
+if __name__ == "__main__":
+    print(f"Migrated {asyncio.run(migrate_legacy_media())} multimedia files to GridFS")